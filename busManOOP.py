@@ -1,3 +1,9 @@
+import json
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from itertools import islice
+
 class TransportVehicle:
     """
     Represents a single transport vehicle, typically a bus in this system.
@@ -69,7 +75,7 @@ class Traveler:
     Represents a passenger who wishes to book a seat on a transport vehicle.
     Stores personal details and a reference to the specific vehicle and route they booked.
     """
-    def __init__(self, full_name, contact_number, booked_vehicle_instance):
+    def __init__(self, full_name, contact_number, booked_vehicle_instance, booked_trip=None, booked_at=None):
         """
         Initializes a new passenger.
 
@@ -78,10 +84,190 @@ class Traveler:
             contact_number (str): The traveler's phone number.
             booked_vehicle_instance (TransportVehicle): The specific vehicle object
                                                         the passenger booked a seat on.
+            booked_trip (ScheduledTrip, optional): The dated trip booked, if any.
+            booked_at (float, optional): Booking time in seconds since the epoch. Defaults to now.
         """
         self.full_name = full_name
         self.contact_number = contact_number
         self.booked_vehicle = booked_vehicle_instance # Link to the vehicle instance they booked
+        # When the booking was made (seconds since the epoch)
+        self.booked_at = booked_at if booked_at is not None else time.time()
+        self.booked_trip = booked_trip # None for bookings on a vehicle's undated seats
+
+def to_local_time(moment):
+    """
+    Converts a timezone-aware datetime to naive local time, so it can be compared
+    with the naive departure times kept in the schedule. Naive datetimes are
+    returned unchanged.
+    """
+    if moment.tzinfo is not None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment
+
+
+class ScheduledTrip:
+    """
+    Represents one dated run of a vehicle on a route.
+    Every trip has its own seat inventory, so the same vehicle can run
+    the same (or another) route on different days.
+    """
+    def __init__(self, vehicle_obj, route_obj, departure_time):
+        """
+        Initializes a new scheduled trip with all seats open.
+
+        Args:
+            vehicle_obj (TransportVehicle): The vehicle running the trip.
+            route_obj (Route): The route the trip runs on.
+            departure_time (datetime): When the trip departs, to the second. Timezone-aware
+                                       times are converted to local time.
+        """
+        # Trip IDs go down to the second, so finer precision would only cause collisions
+        departure_time = to_local_time(departure_time).replace(microsecond=0)
+        self.trip_id = f"{vehicle_obj.vehicle_id}@{departure_time:%Y%m%d%H%M%S}"
+        self.vehicle = vehicle_obj
+        self.route = route_obj
+        self.departure_time = departure_time
+        self.maximum_seating = vehicle_obj.maximum_seating
+        self.occupied_seats = 0 # Seats taken on this trip only
+
+    def get_available_seats(self):
+        """
+        Calculates and returns the number of seats still open on this trip.
+        """
+        return self.maximum_seating - self.occupied_seats
+
+    def reserve_seat(self):
+        """
+        Attempts to book one seat on this trip.
+        Returns True if a seat was reserved, False if the trip is full.
+        """
+        if self.get_available_seats() > 0:
+            self.occupied_seats += 1
+            return True
+        else:
+            return False
+
+    def get_trip_info(self):
+        """
+        Returns a string summarizing the trip.
+        """
+        return (f"Trip {self.trip_id}: {self.route.get_route_info()}, "
+                f"departs {self.departure_time:%Y-%m-%d %H:%M}, "
+                f"Available Seats: {self.get_available_seats()}/{self.maximum_seating}")
+
+
+class TripSchedule:
+    """
+    Holds the upcoming scheduled trips, indexed by origin and destination
+    and sorted by departure time, so the next departures after a given time
+    are found with a binary search instead of a scan over the whole schedule.
+    Trips that have departed are moved out to an archive file to keep
+    the in-memory schedule small.
+    """
+    def __init__(self, archive_path="archived_trips.jsonl"):
+        """
+        Initializes an empty schedule.
+
+        Args:
+            archive_path (str): JSON Lines file that departed trips are appended to.
+        """
+        self.archive_path = archive_path
+        self.trips_by_id = {} # Upcoming ScheduledTrip objects, keyed by trip_id
+        # (origin, destination) -> ([departure times, ascending], [trips in the same order])
+        self.departures_by_leg = {}
+
+    def __len__(self):
+        return len(self.trips_by_id)
+
+    def add_trip(self, trip):
+        """
+        Inserts a trip into the schedule, keeping its leg's departures sorted.
+        """
+        leg = (trip.route.origin, trip.route.destination)
+        departure_times, trips = self.departures_by_leg.setdefault(leg, ([], []))
+        # Insert after trips with the same departure time so they stay in scheduling order
+        position = bisect_right(departure_times, trip.departure_time)
+        departure_times.insert(position, trip.departure_time)
+        trips.insert(position, trip)
+        self.trips_by_id[trip.trip_id] = trip
+
+    def next_departures(self, origin, destination, after_time, limit=5):
+        """
+        Finds the earliest trips from origin to destination departing after a given time
+        that still have free seats.
+
+        Args:
+            origin (str): Starting point.
+            destination (str): Ending point.
+            after_time (datetime): Only trips departing after this time are returned.
+            limit (int): Maximum number of trips to return.
+        Returns:
+            list: ScheduledTrip objects ordered by departure time.
+        """
+        departure_times, trips = self.departures_by_leg.get((origin, destination), ([], []))
+        found_trips = []
+        position = bisect_right(departure_times, to_local_time(after_time))
+        while position < len(trips) and len(found_trips) < limit:
+            if trips[position].get_available_seats() > 0:
+                found_trips.append(trips[position])
+            position += 1
+        return found_trips
+
+    def archive_departed(self, now):
+        """
+        Removes every trip that departed before 'now' from the schedule and
+        appends it to the archive file.
+
+        Args:
+            now (datetime): The cut-off time, normally the booking system's current time.
+        Returns:
+            int: The number of trips archived.
+        """
+        now = to_local_time(now)
+        # Departed trips are always at the front of each leg's sorted lists
+        departed_counts = {}
+        departed_trips = []
+        for leg, (departure_times, trips) in self.departures_by_leg.items():
+            cut = bisect_left(departure_times, now)
+            if cut > 0:
+                departed_counts[leg] = cut
+                departed_trips.extend(trips[:cut])
+        if not departed_trips:
+            return 0
+
+        # Write the archive before touching the schedule, so a failed write loses no trips
+        archive_lines = [json.dumps({
+            'trip_id': trip.trip_id,
+            'vehicle_id': trip.vehicle.vehicle_id,
+            'route_name': trip.route.name,
+            'departure_time': trip.departure_time.isoformat(),
+            'occupied_seats': trip.occupied_seats,
+            'maximum_seating': trip.maximum_seating
+        }) + "\n" for trip in departed_trips]
+        with open(self.archive_path, "a", encoding="utf-8") as archive_file:
+            archive_file.write("".join(archive_lines))
+
+        for leg, cut in departed_counts.items():
+            departure_times, trips = self.departures_by_leg[leg]
+            del departure_times[:cut]
+            del trips[:cut]
+            if not trips:
+                del self.departures_by_leg[leg]
+        for trip in departed_trips:
+            del self.trips_by_id[trip.trip_id]
+        return len(departed_trips)
+
+    def load_archive(self):
+        """
+        Reads back the archived trips as a list of dictionaries.
+        Returns an empty list if nothing has been archived yet.
+        """
+        try:
+            with open(self.archive_path, encoding="utf-8") as archive_file:
+                return [json.loads(line) for line in archive_file if line.strip()]
+        except FileNotFoundError:
+            return []
+
 
 class CentralBookingSystem:
     """
@@ -89,14 +275,24 @@ class CentralBookingSystem:
     Handles operations like defining routes, adding vehicles, processing tickets,
     and displaying information.
     """
-    def __init__(self):
+    def __init__(self, clock=time.time):
         """
         Initializes the central booking system with empty dictionaries/lists
         for routes, vehicles, and passenger records.
+
+        Args:
+            clock (callable): Returns the current time in seconds since the epoch.
+                              Used to timestamp bookings; a replay can pass trace time.
         """
+        self.clock = clock
         self.routes = {} # Stores Route objects, keyed by route name
         self.fleet_of_vehicles = {} # Stores TransportVehicle objects, keyed by vehicle_id
         self.customer_records = [] # A list to store all Traveler objects
+        # Route name -> {(name, phone): time joined} for passengers turned away by a full vehicle.
+        # Dicts keep insertion order, so the oldest entry is served first.
+        self.waitlist = {}
+        self.analytics = BookingAnalytics() # Revenue and occupancy reports, updated on every booking
+        self.trip_schedule = TripSchedule() # Dated trips, each with its own seat inventory
 
     def add_route(self, name, origin, destination, base_fare):
         """
@@ -150,6 +346,7 @@ class CentralBookingSystem:
         # Create a new TransportVehicle object, linking it to the Route object
         new_vehicle = TransportVehicle(vehicle_id, assigned_route_obj, maximum_seating)
         self.fleet_of_vehicles[vehicle_id] = new_vehicle
+        self.analytics.record_vehicle(vehicle_id, route_name, maximum_seating)
         print(f"Vehicle '{vehicle_id}' assigned to route '{route_name}' with {maximum_seating} seats added successfully.")
         return True
 
@@ -164,15 +361,30 @@ class CentralBookingSystem:
         if vehicle_to_book:
             if vehicle_to_book.reserve_seat():
                 # Booking is successful, create a new Traveler object
-                new_passenger = Traveler(customer_name, customer_phone, vehicle_to_book)
+                new_passenger = Traveler(customer_name, customer_phone, vehicle_to_book,
+                                         booked_at=self.clock())
                 self.customer_records.append(new_passenger)
                 # Retrieve fare from the vehicle's assigned route
                 fare = vehicle_to_book.assigned_route.base_fare
+                self.analytics.record_booking(vehicle_to_book.assigned_route.name, desired_vehicle_id,
+                                              fare, new_passenger.booked_at)
+                # A waitlisted passenger who books a seat is no longer waiting
+                self.waitlist.get(vehicle_to_book.assigned_route.name, {}).pop((customer_name, customer_phone), None)
                 print(f"Ticket successfully reserved on vehicle {desired_vehicle_id}!")
                 print(f"Booking Fare: {fare:.2f} units.")
                 return
             else:
+                # Remember the unmet demand so vehicles can later be moved to this route
+                route_name = vehicle_to_book.assigned_route.name
+                route_waitlist = self.waitlist.setdefault(route_name, {})
                 print(f"Apologies, vehicle {desired_vehicle_id} has no seats currently available.")
+                if (customer_name, customer_phone) in route_waitlist:
+                    # Repeated attempts keep the passenger's original place in the queue
+                    print(f"You are already on the waitlist for route '{route_name}'.")
+                    return
+                route_waitlist[(customer_name, customer_phone)] = self.clock()
+                print(f"You have been added to the waitlist for route '{route_name}' and will be "
+                      f"booked automatically if another vehicle is moved to this route.")
                 return
         else:
             print(f"Vehicle with ID '{desired_vehicle_id}' was not found in our system.")
@@ -204,6 +416,581 @@ class CentralBookingSystem:
                       f"Available Seats: {vehicle_obj.get_available_seats()}/{vehicle_obj.maximum_seating}")
             print("-----------------------------------------------")
 
+    def schedule_trip(self, vehicle_id, departure_time, route_name=None):
+        """
+        Schedules a dated trip for a vehicle. The trip gets its own seats,
+        independent of the vehicle's other trips.
+
+        Args:
+            vehicle_id (str): The vehicle running the trip.
+            departure_time (datetime): When the trip departs, to the second. Timezone-aware
+                                       times are converted to local time.
+            route_name (str, optional): The route to run. Defaults to the vehicle's assigned route.
+        Returns:
+            bool: True if the trip was scheduled, False otherwise.
+        """
+        vehicle_obj = self.fleet_of_vehicles.get(vehicle_id)
+        if vehicle_obj is None:
+            print(f"Error: Vehicle with ID '{vehicle_id}' was not found in our system.")
+            return False
+
+        if route_name is None:
+            route_obj = vehicle_obj.assigned_route
+        elif route_name in self.routes:
+            route_obj = self.routes[route_name]
+        else:
+            print(f"Error: Route '{route_name}' not found. Please add the route first.")
+            return False
+
+        new_trip = ScheduledTrip(vehicle_obj, route_obj, departure_time)
+        if new_trip.trip_id in self.trip_schedule.trips_by_id:
+            print(f"Error: Vehicle '{vehicle_id}' already has a trip departing at "
+                  f"{new_trip.departure_time:%Y-%m-%d %H:%M:%S}.")
+            return False
+
+        self.trip_schedule.add_trip(new_trip)
+        self.analytics.record_trip(vehicle_id, route_obj.name, new_trip.maximum_seating)
+        print(f"Trip '{new_trip.trip_id}' on route '{route_obj.name}' scheduled successfully.")
+        return True
+
+    def process_trip_booking(self, trip_id, customer_name, customer_phone):
+        """
+        Attempts to book a ticket for a customer on a scheduled trip.
+        """
+        trip_to_book = self.trip_schedule.trips_by_id.get(trip_id)
+
+        if trip_to_book:
+            if trip_to_book.departure_time <= datetime.fromtimestamp(self.clock()):
+                print(f"Apologies, trip {trip_id} has already departed.")
+            elif trip_to_book.reserve_seat():
+                new_passenger = Traveler(customer_name, customer_phone, trip_to_book.vehicle, trip_to_book,
+                                         booked_at=self.clock())
+                self.customer_records.append(new_passenger)
+                fare = trip_to_book.route.base_fare
+                self.analytics.record_booking(trip_to_book.route.name, trip_to_book.vehicle.vehicle_id,
+                                              fare, new_passenger.booked_at, is_trip=True)
+                print(f"Ticket successfully reserved on trip {trip_id}!")
+                print(f"Booking Fare: {fare:.2f} units.")
+            else:
+                print(f"Apologies, trip {trip_id} has no seats currently available.")
+        else:
+            print(f"Trip with ID '{trip_id}' was not found among upcoming trips.")
+
+    def display_next_departures(self, origin, destination, after_time, limit=5):
+        """
+        Shows the next trips from origin to destination after a given time that have free seats.
+        """
+        upcoming_trips = self.trip_schedule.next_departures(origin, destination, after_time, limit)
+        if not upcoming_trips:
+            print(f"No upcoming trips with free seats from {origin} to {destination}.")
+        else:
+            print(f"\n--- Next Departures from {origin} to {destination} ---")
+            for trip in upcoming_trips:
+                print(trip.get_trip_info())
+            print("-----------------------------------------------")
+
+    def archive_departed_trips(self, now=None):
+        """
+        Moves trips that have already departed from the schedule to the archive file.
+
+        Args:
+            now (datetime, optional): The cut-off time. Defaults to the system clock's current time.
+        Returns:
+            int: The number of trips archived.
+        """
+        if now is None:
+            now = datetime.fromtimestamp(self.clock())
+        try:
+            archived_count = self.trip_schedule.archive_departed(now)
+        except OSError as error:
+            print(f"Error: Could not write the trip archive ({error}). No trips were archived.")
+            return 0
+        print(f"{archived_count} departed trip(s) archived to '{self.trip_schedule.archive_path}'.")
+        return archived_count
+
+    def reassign_vehicles(self, reassignment_plan):
+        """
+        Moves vehicles to new routes as a single all-or-nothing step.
+        Every move is checked first; if any of them is invalid, no vehicle is moved.
+
+        Args:
+            reassignment_plan (dict): Maps vehicle IDs to the name of their new route.
+        Returns:
+            bool: True if all vehicles were moved, False if the plan was rejected.
+        """
+        for vehicle_id, route_name in reassignment_plan.items():
+            vehicle_obj = self.fleet_of_vehicles.get(vehicle_id)
+            if vehicle_obj is None:
+                print(f"Error: Vehicle with ID '{vehicle_id}' was not found. No vehicles were moved.")
+                return False
+            if route_name not in self.routes:
+                print(f"Error: Route '{route_name}' not found. No vehicles were moved.")
+                return False
+            if vehicle_obj.occupied_seats > 0:
+                # Passengers already hold tickets for this vehicle's current route
+                print(f"Error: Vehicle '{vehicle_id}' already has bookings and cannot be moved. No vehicles were moved.")
+                return False
+
+        for vehicle_id, route_name in reassignment_plan.items():
+            vehicle_obj = self.fleet_of_vehicles[vehicle_id]
+            self.analytics.move_vehicle(vehicle_id, vehicle_obj.assigned_route.name, route_name,
+                                        vehicle_obj.maximum_seating)
+            vehicle_obj.assigned_route = self.routes[route_name]
+        print(f"{len(reassignment_plan)} vehicle(s) reassigned successfully.")
+
+        # The moved vehicles are empty, so use them to serve each route's waitlist
+        for vehicle_id, route_name in reassignment_plan.items():
+            self.book_waitlisted_passengers(self.fleet_of_vehicles[vehicle_id])
+        return True
+
+    def book_waitlisted_passengers(self, vehicle_obj):
+        """
+        Books passengers waiting for the vehicle's route onto its free seats,
+        in the order they joined the waitlist.
+
+        Args:
+            vehicle_obj (TransportVehicle): The vehicle with free seats.
+        Returns:
+            int: The number of waitlisted passengers booked.
+        """
+        route_obj = vehicle_obj.assigned_route
+        route_waitlist = self.waitlist.get(route_obj.name, {})
+        # Take the whole batch in one pass; the oldest entries come first
+        next_in_line = list(islice(route_waitlist, vehicle_obj.get_available_seats()))
+        booked_count = 0
+        for customer_name, customer_phone in next_in_line:
+            if not vehicle_obj.reserve_seat():
+                break
+            del route_waitlist[(customer_name, customer_phone)]
+            new_passenger = Traveler(customer_name, customer_phone, vehicle_obj, booked_at=self.clock())
+            self.customer_records.append(new_passenger)
+            self.analytics.record_booking(route_obj.name, vehicle_obj.vehicle_id,
+                                          route_obj.base_fare, new_passenger.booked_at)
+            booked_count += 1
+        if booked_count:
+            print(f"{booked_count} waitlisted passenger(s) booked on vehicle {vehicle_obj.vehicle_id} "
+                  f"for route '{route_obj.name}'.")
+        return booked_count
+
+
+class BookingAnalytics:
+    """
+    Keeps revenue, booking and load-factor reports up to date as bookings happen,
+    so reading a report never needs a pass over the booking history.
+    Totals are kept per route, per vehicle and per time bucket. Bookings on scheduled
+    trips are kept apart from bookings on a vehicle's undated seats, because each
+    trip adds its own seats and mixing the two would distort both load factors.
+    Historical bookings added by backfill() count toward bookings and revenue but not
+    toward load factors, since the seats they were made on are not part of the capacity.
+    """
+    def __init__(self, bucket_seconds=3600):
+        """
+        Initializes empty reports.
+
+        Args:
+            bucket_seconds (int): Length of a time bucket in seconds (default: one hour).
+        """
+        self.bucket_seconds = bucket_seconds
+        # Each totals row is [bookings, revenue, seat capacity, bookings holding a seat in that capacity]
+        self.route_totals = {} # Route name -> totals row for undated seats
+        self.vehicle_totals = {} # Vehicle ID -> totals row for undated seats
+        self.trip_route_totals = {} # Route name -> totals row for scheduled trips
+        self.trip_vehicle_totals = {} # Vehicle ID -> totals row for scheduled trips
+        # Bucket start time -> [bookings, revenue, seated undated bookings, seated undated bookings so far, fleet capacity]
+        self.bucket_totals = {}
+        self.total_bookings = 0
+        self.total_revenue = 0.0
+        self.undated_bookings = 0 # Undated bookings holding a seat in the fleet capacity
+        self.fleet_capacity = 0 # Undated seats across the fleet
+
+    def record_vehicle(self, vehicle_id, route_name, maximum_seating):
+        """
+        Adds a new vehicle's seats to the capacity of its route and of the fleet.
+        """
+        self.vehicle_totals.setdefault(vehicle_id, [0, 0.0, 0, 0])[2] += maximum_seating
+        self.route_totals.setdefault(route_name, [0, 0.0, 0, 0])[2] += maximum_seating
+        self.fleet_capacity += maximum_seating
+
+    def record_trip(self, vehicle_id, route_name, maximum_seating):
+        """
+        Adds the seats of a newly scheduled trip to the trip capacity of its vehicle and route.
+        """
+        self.trip_vehicle_totals.setdefault(vehicle_id, [0, 0.0, 0, 0])[2] += maximum_seating
+        self.trip_route_totals.setdefault(route_name, [0, 0.0, 0, 0])[2] += maximum_seating
+
+    def move_vehicle(self, vehicle_id, old_route_name, new_route_name, maximum_seating):
+        """
+        Moves a vehicle's seats from one route's capacity to another's.
+        """
+        self.route_totals.setdefault(old_route_name, [0, 0.0, 0, 0])[2] -= maximum_seating
+        self.route_totals.setdefault(new_route_name, [0, 0.0, 0, 0])[2] += maximum_seating
+
+    def record_booking(self, route_name, vehicle_id, fare, booked_at, is_trip=False):
+        """
+        Adds one booking to every report.
+
+        Args:
+            route_name (str): Route the booked vehicle serves.
+            vehicle_id (str): The booked vehicle.
+            fare (float): Fare paid for the booking.
+            booked_at (float): Booking time in seconds since the epoch.
+            is_trip (bool): True if the booking is on a scheduled trip.
+        """
+        self.total_bookings += 1
+        self.total_revenue += fare
+        route_totals, vehicle_totals = self._totals_for(is_trip)
+        route_row = route_totals.setdefault(route_name, [0, 0.0, 0, 0])
+        route_row[0] += 1
+        route_row[1] += fare
+        route_row[3] += 1
+        vehicle_row = vehicle_totals.setdefault(vehicle_id, [0, 0.0, 0, 0])
+        vehicle_row[0] += 1
+        vehicle_row[1] += fare
+        vehicle_row[3] += 1
+        bucket_start = int(booked_at // self.bucket_seconds) * self.bucket_seconds
+        bucket_row = self.bucket_totals.setdefault(bucket_start, [0, 0.0, 0, 0, 0])
+        bucket_row[0] += 1
+        bucket_row[1] += fare
+        if not is_trip:
+            self.undated_bookings += 1
+            bucket_row[2] += 1
+        # Snapshot the fleet-wide fill rate as of the latest booking in this bucket
+        bucket_row[3] = self.undated_bookings
+        bucket_row[4] = self.fleet_capacity
+
+    def backfill(self, route_names, vehicle_ids, fares, booked_at, trip_flags=None, seated=False):
+        """
+        Adds a batch of historical bookings given as parallel columns, one entry per booking.
+        The columns are aggregated first and then merged into the reports, which is much
+        faster than recording the bookings one at a time.
+        Unless 'seated' is True, the bookings only add to bookings and revenue: the seats
+        they were made on are not in the tracked capacity, so they must not raise load factors.
+
+        Args:
+            route_names (list): Route name of each booking.
+            vehicle_ids (list): Vehicle ID of each booking.
+            fares (list): Fare paid for each booking.
+            booked_at (list): Booking time of each booking in seconds since the epoch.
+            trip_flags (list, optional): Whether each booking is on a scheduled trip.
+                                         Defaults to all bookings being on undated seats.
+            seated (bool): True if the bookings still hold seats in the tracked capacity,
+                           e.g. when rebuilding the totals from the system's own records.
+        """
+        if trip_flags is None:
+            trip_flags = [False] * len(fares)
+        if not (len(route_names) == len(vehicle_ids) == len(fares) == len(booked_at) == len(trip_flags)):
+            raise ValueError("All backfill columns must have the same length.")
+
+        # Aggregate each grouping column on its own before touching the reports
+        bucket_seconds = self.bucket_seconds
+        batch_by_route = {}
+        for route_name, is_trip, fare in zip(route_names, trip_flags, fares):
+            route_row = batch_by_route.get((is_trip, route_name))
+            if route_row is None:
+                batch_by_route[(is_trip, route_name)] = [1, fare]
+            else:
+                route_row[0] += 1
+                route_row[1] += fare
+        batch_by_vehicle = {}
+        for vehicle_id, is_trip, fare in zip(vehicle_ids, trip_flags, fares):
+            vehicle_row = batch_by_vehicle.get((is_trip, vehicle_id))
+            if vehicle_row is None:
+                batch_by_vehicle[(is_trip, vehicle_id)] = [1, fare]
+            else:
+                vehicle_row[0] += 1
+                vehicle_row[1] += fare
+        batch_by_bucket = {}
+        for booking_time, is_trip, fare in zip(booked_at, trip_flags, fares):
+            bucket_start = int(booking_time // bucket_seconds) * bucket_seconds
+            bucket_row = batch_by_bucket.get(bucket_start)
+            if bucket_row is None:
+                bucket_row = batch_by_bucket[bucket_start] = [0, 0.0, 0]
+            bucket_row[0] += 1
+            bucket_row[1] += fare
+            if not is_trip:
+                bucket_row[2] += 1
+
+        for (is_trip, route_name), (bookings, revenue) in batch_by_route.items():
+            route_row = self._totals_for(is_trip)[0].setdefault(route_name, [0, 0.0, 0, 0])
+            route_row[0] += bookings
+            route_row[1] += revenue
+            if seated:
+                route_row[3] += bookings
+        for (is_trip, vehicle_id), (bookings, revenue) in batch_by_vehicle.items():
+            vehicle_row = self._totals_for(is_trip)[1].setdefault(vehicle_id, [0, 0.0, 0, 0])
+            vehicle_row[0] += bookings
+            vehicle_row[1] += revenue
+            if seated:
+                vehicle_row[3] += bookings
+        for bucket_start, (bookings, revenue, undated_bookings) in batch_by_bucket.items():
+            # The fleet size at that time is unknown, so the bucket gets no load factor
+            bucket_row = self.bucket_totals.setdefault(bucket_start, [0, 0.0, 0, 0, 0])
+            bucket_row[0] += bookings
+            bucket_row[1] += revenue
+            if seated:
+                bucket_row[2] += undated_bookings
+                self.undated_bookings += undated_bookings
+        self.total_bookings += len(fares)
+        self.total_revenue += sum(fares)
+
+        if not seated:
+            return
+        # Seated historical bookings shift the running totals of every later bucket
+        undated_so_far = 0
+        for bucket_start in sorted(self.bucket_totals):
+            bucket_row = self.bucket_totals[bucket_start]
+            undated_so_far += bucket_row[2]
+            bucket_row[3] = undated_so_far
+
+    def backfill_from_records(self, customer_records):
+        """
+        Rebuilds the booking totals from a list of Traveler records, e.g. after
+        loading bookings that were made before the reports existed.
+        Existing booking, revenue and time totals are discarded first, so the records
+        must be the complete booking history; seat capacities are kept. The records'
+        bookings hold seats in those capacities, so they count toward load factors.
+        """
+        all_rows = (list(self.route_totals.values()) + list(self.vehicle_totals.values())
+                    + list(self.trip_route_totals.values()) + list(self.trip_vehicle_totals.values()))
+        for totals_row in all_rows:
+            totals_row[0] = 0
+            totals_row[1] = 0.0
+            totals_row[3] = 0
+        self.bucket_totals = {}
+        self.total_bookings = 0
+        self.total_revenue = 0.0
+        self.undated_bookings = 0
+        # Trip bookings belong to the trip's route, which may differ from the vehicle's current one
+        booked_routes = [traveler.booked_trip.route if traveler.booked_trip else traveler.booked_vehicle.assigned_route
+                         for traveler in customer_records]
+        self.backfill([route_obj.name for route_obj in booked_routes],
+                      [traveler.booked_vehicle.vehicle_id for traveler in customer_records],
+                      [route_obj.base_fare for route_obj in booked_routes],
+                      [traveler.booked_at for traveler in customer_records],
+                      [traveler.booked_trip is not None for traveler in customer_records],
+                      seated=True)
+
+    def _totals_for(self, is_trip):
+        """
+        Returns the (route totals, vehicle totals) that a booking of this kind belongs to.
+        """
+        if is_trip:
+            return self.trip_route_totals, self.trip_vehicle_totals
+        return self.route_totals, self.vehicle_totals
+
+    @staticmethod
+    def _load_factor(bookings, seat_capacity):
+        return bookings / seat_capacity if seat_capacity > 0 else 0.0
+
+    def route_report(self, trips=False):
+        """
+        Returns a list of (route name, bookings, revenue, load factor), one per route.
+        Covers undated seats, or scheduled trips if 'trips' is True.
+        """
+        return [(route_name, bookings, revenue, self._load_factor(seated_bookings, seat_capacity))
+                for route_name, (bookings, revenue, seat_capacity, seated_bookings) in self._totals_for(trips)[0].items()]
+
+    def vehicle_report(self, trips=False):
+        """
+        Returns a list of (vehicle ID, bookings, revenue, load factor), one per vehicle.
+        Covers undated seats, or scheduled trips if 'trips' is True.
+        """
+        return [(vehicle_id, bookings, revenue, self._load_factor(seated_bookings, seat_capacity))
+                for vehicle_id, (bookings, revenue, seat_capacity, seated_bookings) in self._totals_for(trips)[1].items()]
+
+    def time_report(self):
+        """
+        Returns a list of (bucket start, bookings, revenue, fleet load factor at the end
+        of the bucket), ordered by time. Bookings and revenue include scheduled trips;
+        the load factor covers the fleet's undated seats and leaves out backfilled bookings.
+        It is None for buckets that only hold backfilled bookings, because the fleet size
+        at that time is unknown.
+        """
+        return [(bucket_start, bookings, revenue,
+                 self._load_factor(undated_so_far, fleet_capacity) if fleet_capacity > 0 else None)
+                for bucket_start, (bookings, revenue, _, undated_so_far, fleet_capacity)
+                in sorted(self.bucket_totals.items())]
+
+    def display_reports(self):
+        """
+        Prints the revenue and occupancy reports per route, per vehicle and over time.
+        """
+        if not self.total_bookings:
+            print("No bookings have been made yet.")
+            return
+        print("\n--- Revenue & Occupancy by Route ---")
+        for route_name, bookings, revenue, load_factor in self.route_report():
+            print(f"Route Name: {route_name}, Bookings: {bookings}, "
+                  f"Revenue: {revenue:.2f} units, Load Factor: {load_factor:.1%}")
+        print("\n--- Revenue & Occupancy by Vehicle ---")
+        for vehicle_id, bookings, revenue, load_factor in self.vehicle_report():
+            print(f"Vehicle ID: {vehicle_id}, Bookings: {bookings}, "
+                  f"Revenue: {revenue:.2f} units, Load Factor: {load_factor:.1%}")
+        if self.trip_route_totals:
+            print("\n--- Scheduled Trips by Route ---")
+            for route_name, bookings, revenue, load_factor in self.route_report(trips=True):
+                print(f"Route Name: {route_name}, Bookings: {bookings}, "
+                      f"Revenue: {revenue:.2f} units, Load Factor: {load_factor:.1%}")
+            print("\n--- Scheduled Trips by Vehicle ---")
+            for vehicle_id, bookings, revenue, load_factor in self.vehicle_report(trips=True):
+                print(f"Vehicle ID: {vehicle_id}, Bookings: {bookings}, "
+                      f"Revenue: {revenue:.2f} units, Load Factor: {load_factor:.1%}")
+        print("\n--- Bookings Over Time ---")
+        for bucket_start, bookings, revenue, load_factor in self.time_report():
+            bucket_label = time.strftime("%Y-%m-%d %H:%M", time.localtime(bucket_start))
+            load_factor_label = f"{load_factor:.1%}" if load_factor is not None else "unknown"
+            print(f"From {bucket_label}: Bookings: {bookings}, "
+                  f"Revenue: {revenue:.2f} units, Fleet Load Factor: {load_factor_label}")
+        print(f"\nTotal Bookings: {self.total_bookings}, Total Revenue: {self.total_revenue:.2f} units")
+        print("------------------------------------")
+
+
+class FleetOptimizer:
+    """
+    Plans how unbooked vehicles should be moved between routes so that the seats
+    on offer follow passenger demand. Vehicles with bookings never move.
+    Vehicles first serve the route they are already on; only surplus vehicles
+    are moved to routes whose demand is still uncovered.
+    """
+    OBJECTIVES = ("seats", "revenue")
+
+    def __init__(self, booking_system, objective="seats"):
+        """
+        Initializes the optimizer for a booking system.
+
+        Args:
+            booking_system (CentralBookingSystem): The system whose fleet is planned.
+            objective (str): "seats" to maximize seats sold, "revenue" to fill
+                             the routes with the highest fares first.
+        """
+        if objective not in self.OBJECTIVES:
+            raise ValueError(f"Unknown objective '{objective}'. Choose one of {', '.join(self.OBJECTIVES)}.")
+        self.booking_system = booking_system
+        self.objective = objective
+
+    def route_demand(self):
+        """
+        Estimates the demand of every route as the seats already booked on it
+        plus the passengers waiting for it.
+
+        Returns:
+            dict: Route name -> number of seats wanted.
+        """
+        demand = {route_name: len(waiting) for route_name, waiting in self.booking_system.waitlist.items()}
+        for vehicle_obj in self.booking_system.fleet_of_vehicles.values():
+            route_name = vehicle_obj.assigned_route.name
+            demand[route_name] = demand.get(route_name, 0) + vehicle_obj.occupied_seats
+        return demand
+
+    def plan_reassignment(self, demand=None):
+        """
+        Computes which unbooked vehicles should move and where.
+
+        Args:
+            demand (dict, optional): Route name -> seats wanted. Defaults to route_demand().
+        Returns:
+            dict: Vehicle ID -> new route name, only for vehicles that should move.
+        """
+        if demand is None:
+            demand = self.route_demand()
+        routes = self.booking_system.routes
+        uncovered_demand = {route_name: demand.get(route_name, 0) for route_name in routes}
+
+        # Vehicles with bookings stay put and cover part of their route's demand
+        unbooked_by_route = {}
+        for vehicle_id, vehicle_obj in self.booking_system.fleet_of_vehicles.items():
+            route_name = vehicle_obj.assigned_route.name
+            if vehicle_obj.occupied_seats > 0:
+                uncovered_demand[route_name] = uncovered_demand.get(route_name, 0) - vehicle_obj.maximum_seating
+            else:
+                unbooked_by_route.setdefault(route_name, []).append((vehicle_obj.maximum_seating, vehicle_id))
+
+        # Unbooked vehicles keep serving their own route while it needs them; the rest are surplus.
+        # Surplus vehicles are grouped by seat count, since fleets have few distinct sizes.
+        surplus_by_seats = {}
+        for route_name, vehicles in unbooked_by_route.items():
+            vehicles.sort(reverse=True)
+            still_needed = uncovered_demand.get(route_name, 0)
+            for maximum_seating, vehicle_id in vehicles:
+                if still_needed > 0:
+                    still_needed -= maximum_seating
+                else:
+                    surplus_by_seats.setdefault(maximum_seating, []).append(vehicle_id)
+            uncovered_demand[route_name] = still_needed
+
+        if self.objective == "revenue":
+            # Every seat is worth the route fare, so serve the most expensive routes first
+            priority = lambda route_name: (routes[route_name].base_fare, uncovered_demand[route_name])
+        else:
+            priority = lambda route_name: uncovered_demand[route_name]
+        routes_in_need = sorted((route_name for route_name, still_needed in uncovered_demand.items()
+                                 if still_needed > 0 and route_name in routes),
+                                key=priority, reverse=True)
+
+        reassignment_plan = {}
+        seat_sizes = sorted(surplus_by_seats) # Distinct seat counts still available, ascending
+        for route_name in routes_in_need:
+            still_needed = uncovered_demand[route_name]
+            while still_needed > 0 and seat_sizes:
+                # Best fit: the smallest vehicle that covers what is left, otherwise the largest one
+                size_index = min(bisect_left(seat_sizes, still_needed), len(seat_sizes) - 1)
+                maximum_seating = seat_sizes[size_index]
+                vehicles_of_size = surplus_by_seats[maximum_seating]
+                reassignment_plan[vehicles_of_size.pop()] = route_name
+                if not vehicles_of_size:
+                    del surplus_by_seats[maximum_seating]
+                    seat_sizes.pop(size_index)
+                still_needed -= maximum_seating
+        return reassignment_plan
+
+    def evaluate(self, reassignment_plan=None, demand=None):
+        """
+        Estimates the seats sold and revenue if demand were served by the fleet
+        after applying a plan (or by the current fleet if no plan is given).
+
+        Returns:
+            tuple: (seats sold, revenue)
+        """
+        if demand is None:
+            demand = self.route_demand()
+        if reassignment_plan is None:
+            reassignment_plan = {}
+        routes = self.booking_system.routes
+        route_capacity = {}
+        for vehicle_id, vehicle_obj in self.booking_system.fleet_of_vehicles.items():
+            route_name = reassignment_plan.get(vehicle_id, vehicle_obj.assigned_route.name)
+            route_capacity[route_name] = route_capacity.get(route_name, 0) + vehicle_obj.maximum_seating
+        seats_sold = 0
+        revenue = 0.0
+        for route_name, seats_wanted in demand.items():
+            if route_name not in routes:
+                continue
+            route_seats = min(seats_wanted, route_capacity.get(route_name, 0))
+            seats_sold += route_seats
+            revenue += route_seats * routes[route_name].base_fare
+        return seats_sold, revenue
+
+    def rebalance(self, demand=None):
+        """
+        Plans a reassignment and applies it to the booking system in one step.
+
+        Returns:
+            dict: The applied plan (empty if nothing needed to move or the plan was rejected).
+        """
+        if demand is None:
+            demand = self.route_demand()
+        reassignment_plan = self.plan_reassignment(demand)
+        if not reassignment_plan:
+            print("The fleet already matches demand; no vehicles need to move.")
+            return {}
+        seats_before, revenue_before = self.evaluate(demand=demand)
+        seats_after, revenue_after = self.evaluate(reassignment_plan, demand)
+        if not self.booking_system.reassign_vehicles(reassignment_plan):
+            return {}
+        print(f"Expected seats sold: {seats_before} -> {seats_after}, "
+              f"expected revenue: {revenue_before:.2f} -> {revenue_after:.2f} units.")
+        return reassignment_plan
+
 
 class SystemAdministrator:
     """
@@ -234,13 +1021,19 @@ class SystemAdministrator:
 
 # --- Program Execution Flow ---
 
-def main():
+def main(system_manager=None):
     """
     The main function to run the transport booking application.
     It sets up the system, handles user input, and navigates through menus.
+
+    Args:
+        system_manager (CentralBookingSystem, optional): An existing booking system to
+                                                         drive (e.g., a recording one).
+                                                         A fresh system is created if omitted.
     """
     # Initialize our central booking system and the administrator account
-    system_manager = CentralBookingSystem()
+    if system_manager is None:
+        system_manager = CentralBookingSystem()
     admin_user = SystemAdministrator()
     is_admin_logged_in = False # Flag to track admin session state
 
@@ -252,9 +1045,10 @@ def main():
         print("1. Administrator Login")
         print("2. Book a Passenger Ticket")
         print("3. View Available Vehicles & Routes") # Combined for user convenience
-        print("4. Exit Application")
+        print("4. Find & Book a Scheduled Trip")
+        print("5. Exit Application")
         
-        user_choice = input("\nPlease enter your choice (1-4): ").strip()
+        user_choice = input("\nPlease enter your choice (1-5): ").strip()
 
         if user_choice == "1":
             # Attempt to log in as administrator
@@ -267,9 +1061,13 @@ def main():
                     print("2. Add a New Vehicle")
                     print("3. View All Defined Routes")
                     print("4. View All Registered Vehicles")
-                    print("5. Logout from Admin Panel")
+                    print("5. Rebalance Vehicles by Demand")
+                    print("6. View Revenue & Occupancy Reports")
+                    print("7. Schedule a Dated Trip")
+                    print("8. Archive Departed Trips")
+                    print("9. Logout from Admin Panel")
                     
-                    admin_action_choice = input("Enter your admin choice (1-5): ").strip()
+                    admin_action_choice = input("Enter your admin choice (1-9): ").strip()
 
                     if admin_action_choice == "1":
                         # Add a new route
@@ -305,11 +1103,38 @@ def main():
                         system_manager.display_all_vehicles()
 
                     elif admin_action_choice == "5":
+                        # Move unbooked vehicles towards the routes with unmet demand
+                        objective = input("Maximize 'seats' or 'revenue'? ").strip().lower() or "seats"
+                        if objective in FleetOptimizer.OBJECTIVES:
+                            FleetOptimizer(system_manager, objective).rebalance()
+                        else:
+                            print("Invalid objective. Please enter 'seats' or 'revenue'.")
+
+                    elif admin_action_choice == "6":
+                        # Show the incrementally maintained reports
+                        system_manager.analytics.display_reports()
+
+                    elif admin_action_choice == "7":
+                        # Schedule a dated trip with its own seat inventory
+                        vehicle_id = input("Enter the vehicle ID for this trip: ").strip()
+                        route_name = input("Enter the route name (leave empty for the vehicle's route): ").strip()
+                        try:
+                            departure_input = input("Enter departure date and time (YYYY-MM-DD HH:MM): ").strip()
+                            departure_time = datetime.strptime(departure_input, "%Y-%m-%d %H:%M")
+                            system_manager.schedule_trip(vehicle_id, departure_time, route_name or None)
+                        except ValueError:
+                            print("Invalid date and time. Please use the format YYYY-MM-DD HH:MM.")
+
+                    elif admin_action_choice == "8":
+                        # Move trips that already left out of the in-memory schedule
+                        system_manager.archive_departed_trips()
+
+                    elif admin_action_choice == "9":
                         # Logout from the admin panel
                         is_admin_logged_in = False
                         print("You have successfully logged out of the administrator panel.")
                     else:
-                        print("Invalid option for admin panel. Please choose a number from 1 to 5.")
+                        print("Invalid option for admin panel. Please choose a number from 1 to 9.")
 
         elif user_choice == "2":
             # Option for passengers to book a ticket
@@ -324,12 +1149,29 @@ def main():
             system_manager.display_all_vehicles()
 
         elif user_choice == "4":
+            # Search upcoming dated trips and book one
+            origin_city = input("Enter origin city: ").strip()
+            destination_city = input("Enter destination city: ").strip()
+            after_input = input("Departing after (YYYY-MM-DD HH:MM, leave empty for now): ").strip()
+            try:
+                after_time = datetime.strptime(after_input, "%Y-%m-%d %H:%M") if after_input else datetime.fromtimestamp(system_manager.clock())
+            except ValueError:
+                print("Invalid date and time. Please use the format YYYY-MM-DD HH:MM.")
+                continue
+            system_manager.display_next_departures(origin_city, destination_city, after_time)
+            requested_trip_id = input("Enter the Trip ID you wish to book (leave empty to go back): ").strip()
+            if requested_trip_id:
+                passenger_name = input("Enter your full name: ").strip()
+                passenger_phone = input("Enter your contact phone number: ").strip()
+                system_manager.process_trip_booking(requested_trip_id, passenger_name, passenger_phone)
+
+        elif user_choice == "5":
             # Exit the application
             print("Thank you for using our transport booking system. Goodbye!")
             break # Breaks out of the main while loop, ending the program
 
         else:
-            print("Invalid choice. Please enter a number between 1 and 4.")
+            print("Invalid choice. Please enter a number between 1 and 5.")
 
 # This ensures that main() is called only when the script is executed directly.
 if __name__ == '__main__':
@@ -0,0 +1,538 @@
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import time
+from datetime import datetime
+
+from busManOOP import CentralBookingSystem, main as run_interactive_system
+
+# --- Trace Format ---
+# A trace is a JSON Lines file. Every line except the last describes one operation:
+#   {"at": 1.25, "op": "book", "args": {...}, "ok": true}
+# 'at' is the number of seconds since recording started, 'op' is one of
+# TRACE_OPERATIONS and 'ok' records whether the operation succeeded when recorded.
+# Dates (trip departures, archive cut-off times) are stored as ISO 8601 strings.
+# The last line stores when recording started (seconds since the epoch) and the
+# seat counts the system ended with, per vehicle and per upcoming scheduled trip:
+#   {"op": "final_seats", "started_at": 1760000000.0, "seats": {"V001": 12, ...},
+#    "trip_seats": {"V001@20300101080000": 3, ...}}
+TRACE_OPERATIONS = ("add_route", "add_vehicle", "book", "list_routes", "list_vehicles",
+                    "reassign_vehicles", "schedule_trip", "book_trip", "archive_trips")
+FINAL_SEATS_OP = "final_seats"
+
+
+class RecordingBookingSystem(CentralBookingSystem):
+    """
+    A CentralBookingSystem that remembers every operation performed on it,
+    together with when it happened and whether it succeeded.
+    The recorded operations can be saved as a trace and replayed later.
+    """
+    def __init__(self):
+        """
+        Initializes an empty booking system and starts the recording clock.
+        """
+        super().__init__()
+        self.trace_records = [] # Recorded operations, in the order they happened
+        self.recording_started = time.monotonic()
+        self.recording_started_at = time.time() # Lets a replay put bookings back at their real times
+
+    def _record(self, operation, arguments, succeeded):
+        """
+        Appends one operation to the trace.
+        """
+        self.trace_records.append({
+            'at': round(time.monotonic() - self.recording_started, 6),
+            'op': operation,
+            'args': arguments,
+            'ok': succeeded
+        })
+
+    def add_route(self, name, origin, destination, base_fare):
+        route_added = super().add_route(name, origin, destination, base_fare)
+        self._record("add_route", {
+            'name': name,
+            'origin': origin,
+            'destination': destination,
+            'base_fare': base_fare
+        }, route_added)
+        return route_added
+
+    def add_new_vehicle(self, vehicle_id, route_name, maximum_seating):
+        vehicle_added = super().add_new_vehicle(vehicle_id, route_name, maximum_seating)
+        self._record("add_vehicle", {
+            'vehicle_id': vehicle_id,
+            'route_name': route_name,
+            'maximum_seating': maximum_seating
+        }, vehicle_added)
+        return vehicle_added
+
+    def process_ticket_booking(self, desired_vehicle_id, customer_name, customer_phone):
+        # process_ticket_booking does not report success, so compare the record count
+        bookings_before = len(self.customer_records)
+        super().process_ticket_booking(desired_vehicle_id, customer_name, customer_phone)
+        self._record("book", {
+            'vehicle_id': desired_vehicle_id,
+            'customer_name': customer_name,
+            'customer_phone': customer_phone
+        }, len(self.customer_records) > bookings_before)
+
+    def reassign_vehicles(self, reassignment_plan):
+        vehicles_moved = super().reassign_vehicles(reassignment_plan)
+        self._record("reassign_vehicles", {'reassignment_plan': dict(reassignment_plan)}, vehicles_moved)
+        return vehicles_moved
+
+    def schedule_trip(self, vehicle_id, departure_time, route_name=None):
+        trip_scheduled = super().schedule_trip(vehicle_id, departure_time, route_name)
+        self._record("schedule_trip", {
+            'vehicle_id': vehicle_id,
+            'departure_time': departure_time.isoformat(),
+            'route_name': route_name
+        }, trip_scheduled)
+        return trip_scheduled
+
+    def process_trip_booking(self, trip_id, customer_name, customer_phone):
+        bookings_before = len(self.customer_records)
+        super().process_trip_booking(trip_id, customer_name, customer_phone)
+        self._record("book_trip", {
+            'trip_id': trip_id,
+            'customer_name': customer_name,
+            'customer_phone': customer_phone
+        }, len(self.customer_records) > bookings_before)
+
+    def archive_departed_trips(self, now=None):
+        # Record the actual cut-off so the replay archives the same trips
+        if now is None:
+            now = datetime.fromtimestamp(self.clock())
+        archived_count = super().archive_departed_trips(now)
+        self._record("archive_trips", {'now': now.isoformat()}, archived_count > 0)
+        return archived_count
+
+    def display_all_routes(self):
+        super().display_all_routes()
+        self._record("list_routes", {}, True)
+
+    def display_all_vehicles(self):
+        super().display_all_vehicles()
+        self._record("list_vehicles", {}, True)
+
+    def save_trace(self, file_path):
+        """
+        Writes the recorded operations and the current seat counts of every vehicle
+        and upcoming scheduled trip to a trace file.
+
+        Args:
+            file_path (str): Where to write the JSON Lines trace.
+        """
+        final_seats = {vehicle_id: vehicle_obj.occupied_seats
+                       for vehicle_id, vehicle_obj in self.fleet_of_vehicles.items()}
+        final_trip_seats = {trip_id: trip.occupied_seats
+                            for trip_id, trip in self.trip_schedule.trips_by_id.items()}
+        with open(file_path, "w", encoding="utf-8") as trace_file:
+            for record in self.trace_records:
+                trace_file.write(json.dumps(record) + "\n")
+            trace_file.write(json.dumps({
+                'op': FINAL_SEATS_OP,
+                'started_at': self.recording_started_at,
+                'seats': final_seats,
+                'trip_seats': final_trip_seats
+            }) + "\n")
+        print(f"Trace with {len(self.trace_records)} operations saved to '{file_path}'.")
+
+
+def load_trace(file_path):
+    """
+    Reads a trace file written by RecordingBookingSystem.save_trace.
+
+    Args:
+        file_path (str): Path of the JSON Lines trace.
+    Returns:
+        tuple: (list of operation records, final snapshot record or None)
+    """
+    operations = []
+    final_snapshot = None
+    with open(file_path, encoding="utf-8") as trace_file:
+        for line_number, line in enumerate(trace_file, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('op') == FINAL_SEATS_OP:
+                final_snapshot = record
+            elif record.get('op') in TRACE_OPERATIONS:
+                operations.append(record)
+            else:
+                raise ValueError(f"Unknown operation {record.get('op')!r} on line {line_number} of '{file_path}'.")
+    # Replay in time order even if the file was edited by hand
+    operations.sort(key=lambda record: record.get('at', 0.0))
+    return operations, final_snapshot
+
+
+# --- Virtual Clock ---
+
+class VirtualClock:
+    """
+    Keeps trace time during a replay.
+    Trace time is mapped onto wall-clock time divided by a speed-up factor,
+    so a one-hour trace replayed at speed-up 60 takes about one minute.
+    A speed-up of 0 replays every operation back to back without waiting.
+    """
+    def __init__(self, speedup=1.0, start_epoch=0.0):
+        """
+        Initializes the clock at trace time zero.
+
+        Args:
+            speedup (float): How many times faster than recorded the trace is replayed.
+                             0 means as fast as possible.
+            start_epoch (float): The date trace time zero corresponds to, in seconds
+                                 since the epoch (usually when the trace was recorded).
+        """
+        if speedup < 0:
+            raise ValueError("Speed-up must be zero or a positive number.")
+        self.speedup = speedup
+        self.current_time = 0.0
+        self.start_epoch = start_epoch
+        self.wall_started = None
+
+    def now(self):
+        """
+        Returns the current trace time in seconds.
+        """
+        return self.current_time
+
+    def epoch_time(self):
+        """
+        Returns the current trace time as seconds since the epoch, so a booking
+        system driven by this clock timestamps bookings in trace time.
+        """
+        return self.start_epoch + self.current_time
+
+    def advance_to(self, trace_time):
+        """
+        Moves the clock forward to the given trace time, waiting in real time
+        when a non-zero speed-up is configured. The clock never moves backwards.
+        """
+        if self.wall_started is None:
+            self.wall_started = time.perf_counter()
+        if trace_time <= self.current_time:
+            return
+        self.current_time = trace_time
+        if self.speedup:
+            # Pace against the replay start rather than the last operation so delays don't add up
+            wall_deadline = self.wall_started + trace_time / self.speedup
+            remaining = wall_deadline - time.perf_counter()
+            if remaining > 0:
+                time.sleep(remaining)
+
+
+# --- Replay Drivers ---
+# A driver applies trace operations to one booking implementation.
+# Each operation method returns True if the operation succeeded.
+
+class ObjectOrientedDriver:
+    """
+    Replays trace operations against a CentralBookingSystem from busManOOP.
+    """
+    def __init__(self, system_manager=None, clock=None):
+        """
+        Args:
+            system_manager (CentralBookingSystem, optional): The system to drive.
+                                                             A fresh one is created if omitted.
+            clock (VirtualClock, optional): Timestamps the bookings of a freshly created
+                                            system in trace time instead of wall-clock time.
+        """
+        if system_manager is None:
+            system_manager = CentralBookingSystem(clock=clock.epoch_time) if clock else CentralBookingSystem()
+            # The recorded session already archived its trips; don't archive them again
+            system_manager.trip_schedule.archive_path = os.devnull
+        self.system_manager = system_manager
+
+    def add_route(self, name, origin, destination, base_fare):
+        return self.system_manager.add_route(name, origin, destination, base_fare)
+
+    def add_vehicle(self, vehicle_id, route_name, maximum_seating):
+        return self.system_manager.add_new_vehicle(vehicle_id, route_name, maximum_seating)
+
+    def book(self, vehicle_id, customer_name, customer_phone):
+        bookings_before = len(self.system_manager.customer_records)
+        self.system_manager.process_ticket_booking(vehicle_id, customer_name, customer_phone)
+        return len(self.system_manager.customer_records) > bookings_before
+
+    def list_routes(self):
+        self.system_manager.display_all_routes()
+        return True
+
+    def list_vehicles(self):
+        self.system_manager.display_all_vehicles()
+        return True
+
+    def reassign_vehicles(self, reassignment_plan):
+        return self.system_manager.reassign_vehicles(reassignment_plan)
+
+    def schedule_trip(self, vehicle_id, departure_time, route_name=None):
+        return self.system_manager.schedule_trip(vehicle_id, datetime.fromisoformat(departure_time), route_name)
+
+    def book_trip(self, trip_id, customer_name, customer_phone):
+        bookings_before = len(self.system_manager.customer_records)
+        self.system_manager.process_trip_booking(trip_id, customer_name, customer_phone)
+        return len(self.system_manager.customer_records) > bookings_before
+
+    def archive_trips(self, now):
+        return self.system_manager.archive_departed_trips(datetime.fromisoformat(now)) > 0
+
+    def occupied_seats(self):
+        return {vehicle_id: vehicle_obj.occupied_seats
+                for vehicle_id, vehicle_obj in self.system_manager.fleet_of_vehicles.items()}
+
+    def occupied_trip_seats(self):
+        return {trip_id: trip.occupied_seats
+                for trip_id, trip in self.system_manager.trip_schedule.trips_by_id.items()}
+
+
+class ProceduralDriver:
+    """
+    Replays trace operations against the busManNoOOP functions.
+    Those functions ask for their arguments with input(), so the driver
+    answers the prompts from the trace instead of the keyboard.
+    The procedural version has no fleet reassignment or scheduled trips,
+    so those operations are reported as unsupported.
+    """
+    def __init__(self, module=None, fresh_state=True):
+        """
+        Args:
+            module (module, optional): The procedural booking module. Defaults to busManNoOOP.
+            fresh_state (bool): Clear the module's sample routes, vehicles and passengers
+                                before replaying, so the trace starts from an empty system.
+        """
+        if module is None:
+            import busManNoOOP as module
+        self.module = module
+        if fresh_state:
+            # Clear in place: the module functions look these globals up by name
+            module.all_routes.clear()
+            module.all_vehicles.clear()
+            module.all_passengers.clear()
+
+    def _answer_prompts(self, function, answers):
+        """
+        Calls a procedural function, feeding it the given answers as keyboard input.
+        If the function asks for more input than was given (it keeps re-prompting
+        after invalid input), the operation is treated as rejected.
+        """
+        remaining_answers = iter(answers)
+        self.module.input = lambda prompt="": next(remaining_answers)
+        try:
+            return function()
+        except StopIteration:
+            return False
+        finally:
+            del self.module.input # Restore the built-in input()
+
+    def add_route(self, name, origin, destination, base_fare):
+        return bool(self._answer_prompts(self.module.add_route,
+                                         [name, origin, destination, str(base_fare)]))
+
+    def add_vehicle(self, vehicle_id, route_name, maximum_seating):
+        return bool(self._answer_prompts(self.module.add_new_vehicle,
+                                         [vehicle_id, route_name, str(maximum_seating)]))
+
+    def book(self, vehicle_id, customer_name, customer_phone):
+        bookings_before = len(self.module.all_passengers)
+        self._answer_prompts(self.module.process_ticket_booking,
+                             [vehicle_id, customer_name, customer_phone])
+        return len(self.module.all_passengers) > bookings_before
+
+    def list_routes(self):
+        self.module.display_all_routes()
+        return True
+
+    def list_vehicles(self):
+        self.module.display_all_vehicles()
+        return True
+
+    def occupied_seats(self):
+        return {vehicle_id: details['occupied_seats']
+                for vehicle_id, details in self.module.all_vehicles.items()}
+
+
+# --- Replay and Reporting ---
+
+def percentile(sorted_values, fraction):
+    """
+    Returns the nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+class ReplayReport:
+    """
+    Collects per-operation latencies and correctness results of a replay.
+    """
+    def __init__(self):
+        self.latencies = {} # Operation name -> list of latencies in seconds
+        self.outcome_mismatches = [] # (trace time, operation, arguments, recorded ok, replayed ok)
+        self.seat_mismatches = {} # Vehicle ID -> (expected seats, replayed seats)
+        self.trip_seat_mismatches = {} # Trip ID -> (expected seats, replayed seats)
+        self.unsupported_operations = {} # Operation name -> count the target could not replay
+        self.virtual_duration = 0.0
+        self.wall_duration = 0.0
+
+    def record_latency(self, operation, seconds):
+        self.latencies.setdefault(operation, []).append(seconds)
+
+    def is_correct(self):
+        """
+        Returns True if every operation was replayed and every outcome and
+        final seat count matched the trace.
+        """
+        return not (self.outcome_mismatches or self.seat_mismatches
+                    or self.trip_seat_mismatches or self.unsupported_operations)
+
+    def print_report(self):
+        """
+        Prints a latency summary per operation followed by the correctness results.
+        """
+        total_operations = sum(len(values) for values in self.latencies.values())
+        print("\n--- Replay Latency Report ---")
+        print(f"Operations: {total_operations}, Trace time: {self.virtual_duration:.3f}s, "
+              f"Wall time: {self.wall_duration:.3f}s")
+        if self.wall_duration > 0:
+            print(f"Throughput: {total_operations / self.wall_duration:.1f} operations/s")
+        for operation in TRACE_OPERATIONS:
+            values = sorted(self.latencies.get(operation, []))
+            if not values:
+                continue
+            mean_ms = sum(values) / len(values) * 1000
+            print(f"{operation:<17} count={len(values):<8} mean={mean_ms:.3f}ms "
+                  f"p50={percentile(values, 0.50) * 1000:.3f}ms "
+                  f"p95={percentile(values, 0.95) * 1000:.3f}ms "
+                  f"p99={percentile(values, 0.99) * 1000:.3f}ms "
+                  f"max={values[-1] * 1000:.3f}ms")
+        print("--- Replay Correctness Report ---")
+        for operation, count in sorted(self.unsupported_operations.items()):
+            print(f"Not supported by this target: {operation} x{count}")
+        print(f"Operation outcome mismatches: {len(self.outcome_mismatches)}")
+        for trace_time, operation, arguments, recorded_ok, replayed_ok in self.outcome_mismatches[:10]:
+            print(f"  at {trace_time:.3f}s {operation} {arguments}: recorded ok={recorded_ok}, replayed ok={replayed_ok}")
+        if self.seat_mismatches or self.trip_seat_mismatches:
+            print(f"Final seat count mismatches: {len(self.seat_mismatches) + len(self.trip_seat_mismatches)}")
+            for vehicle_id, (expected, replayed) in sorted(self.seat_mismatches.items()):
+                print(f"  Vehicle {vehicle_id}: expected {expected}, replayed {replayed}")
+            for trip_id, (expected, replayed) in sorted(self.trip_seat_mismatches.items()):
+                print(f"  Trip {trip_id}: expected {expected}, replayed {replayed}")
+        else:
+            print("Final seat counts match the trace.")
+        print("-----------------------------")
+
+
+def replay_trace(operations, driver, clock=None, final_snapshot=None, quiet=True):
+    """
+    Drives a booking implementation through the operations of a trace.
+
+    Args:
+        operations (list): Operation records as returned by load_trace.
+        driver (ObjectOrientedDriver or ProceduralDriver): The implementation to drive.
+        clock (VirtualClock, optional): Paces the replay. Defaults to replaying without waiting.
+        final_snapshot (dict, optional): The trace's final record, whose seat counts are checked.
+        quiet (bool): Hide the messages the booking system prints while replaying.
+    Returns:
+        ReplayReport: Latency and correctness results.
+    """
+    if clock is None:
+        clock = VirtualClock(speedup=0)
+    report = ReplayReport()
+    # Operations the driver has no method for are counted as unsupported instead of replayed
+    driver_methods = {operation: getattr(driver, operation, None) for operation in TRACE_OPERATIONS}
+    discarded_output = io.StringIO()
+    wall_started = time.perf_counter()
+
+    for record in operations:
+        clock.advance_to(record.get('at', 0.0))
+        operation_method = driver_methods[record['op']]
+        if operation_method is None:
+            report.unsupported_operations[record['op']] = report.unsupported_operations.get(record['op'], 0) + 1
+            continue
+        arguments = record.get('args', {})
+        with contextlib.redirect_stdout(discarded_output) if quiet else contextlib.nullcontext():
+            started = time.perf_counter()
+            succeeded = operation_method(**arguments)
+            report.record_latency(record['op'], time.perf_counter() - started)
+        if quiet:
+            # Drop the captured text so long replays don't hold it all in memory
+            discarded_output.seek(0)
+            discarded_output.truncate()
+        if 'ok' in record and record['ok'] != succeeded:
+            report.outcome_mismatches.append((clock.now(), record['op'], arguments, record['ok'], succeeded))
+
+    report.wall_duration = time.perf_counter() - wall_started
+    report.virtual_duration = clock.now()
+
+    if final_snapshot is not None:
+        expected_seats = final_snapshot['seats']
+        replayed_seats = driver.occupied_seats()
+        for vehicle_id in set(expected_seats) | set(replayed_seats):
+            expected = expected_seats.get(vehicle_id)
+            replayed = replayed_seats.get(vehicle_id)
+            if expected != replayed:
+                report.seat_mismatches[vehicle_id] = (expected, replayed)
+        # Per-trip seats can only be compared on targets that support scheduled trips
+        if hasattr(driver, 'occupied_trip_seats'):
+            expected_trip_seats = final_snapshot.get('trip_seats', {})
+            replayed_trip_seats = driver.occupied_trip_seats()
+            for trip_id in set(expected_trip_seats) | set(replayed_trip_seats):
+                expected = expected_trip_seats.get(trip_id)
+                replayed = replayed_trip_seats.get(trip_id)
+                if expected != replayed:
+                    report.trip_seat_mismatches[trip_id] = (expected, replayed)
+    return report
+
+
+# --- Command Line Entry Point ---
+
+def main():
+    """
+    Records an interactive session to a trace file, or replays a trace file
+    against one of the two booking implementations and prints the reports.
+    """
+    parser = argparse.ArgumentParser(description="Record and replay booking traffic.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subcommands.add_parser("record", help="Run the interactive OOP system and save a trace.")
+    record_parser.add_argument("trace_file")
+
+    replay_parser = subcommands.add_parser("replay", help="Replay a trace and report latency and correctness.")
+    replay_parser.add_argument("trace_file")
+    replay_parser.add_argument("--target", choices=("oop", "nooop"), default="oop",
+                               help="Which implementation to drive (default: oop).")
+    replay_parser.add_argument("--speedup", type=float, default=0,
+                               help="Replay speed-up over recorded time; 0 replays without waiting (default: 0).")
+    replay_parser.add_argument("--verbose", action="store_true",
+                               help="Show the messages printed by the booking system.")
+
+    arguments = parser.parse_args()
+
+    if arguments.command == "record":
+        recording_system = RecordingBookingSystem()
+        try:
+            run_interactive_system(recording_system)
+        finally:
+            recording_system.save_trace(arguments.trace_file)
+        return
+
+    operations, final_snapshot = load_trace(arguments.trace_file)
+    start_epoch = final_snapshot.get('started_at', 0.0) if final_snapshot else 0.0
+    clock = VirtualClock(arguments.speedup, start_epoch)
+    driver = ObjectOrientedDriver(clock=clock) if arguments.target == "oop" else ProceduralDriver()
+    report = replay_trace(operations, driver, clock, final_snapshot, quiet=not arguments.verbose)
+    report.print_report()
+    if not report.is_correct():
+        raise SystemExit(1)
+
+# This ensures that main() is called only when the script is executed directly.
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+
+from busManOOP import BookingAnalytics, CentralBookingSystem, FleetOptimizer, TripSchedule
+
+
+def quietly(function, *args, **kwargs):
+    """
+    Calls a function while hiding the messages it prints.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        return function(*args, **kwargs)
+
+
+class FleetReassignmentTests(unittest.TestCase):
+    def setUp(self):
+        self.system = CentralBookingSystem()
+        quietly(self.system.add_route, "A", "a", "b", 100.0)
+        quietly(self.system.add_route, "B", "b", "c", 10.0)
+        quietly(self.system.add_new_vehicle, "V1", "A", 2)
+        quietly(self.system.add_new_vehicle, "V2", "B", 5)
+        quietly(self.system.add_new_vehicle, "V3", "B", 3)
+
+    def test_plan_with_one_invalid_move_moves_nothing(self):
+        quietly(self.system.process_ticket_booking, "V1", "Ann", "1")
+        # V1 has a booking, so the whole plan must be rejected
+        self.assertFalse(quietly(self.system.reassign_vehicles, {"V3": "A", "V1": "B"}))
+        self.assertEqual(self.system.fleet_of_vehicles["V3"].assigned_route.name, "B")
+        self.assertEqual(self.system.fleet_of_vehicles["V1"].assigned_route.name, "A")
+
+        self.assertFalse(quietly(self.system.reassign_vehicles, {"V3": "A", "V2": "NOPE"}))
+        self.assertEqual(self.system.fleet_of_vehicles["V3"].assigned_route.name, "B")
+
+    def test_full_vehicle_adds_passenger_to_waitlist(self):
+        for passenger in ("Ann", "Bob", "Cid"):
+            quietly(self.system.process_ticket_booking, "V1", passenger, "1")
+        self.assertEqual(list(self.system.waitlist["A"]), [("Cid", "1")])
+        self.assertEqual(FleetOptimizer(self.system).route_demand(), {"A": 3, "B": 0})
+
+    def test_repeated_attempts_join_the_waitlist_once(self):
+        quietly(self.system.process_ticket_booking, "V1", "Ann", "1")
+        quietly(self.system.process_ticket_booking, "V1", "Bob", "1")
+        for attempt in range(3):
+            quietly(self.system.process_ticket_booking, "V1", "Cid", "1")
+        quietly(self.system.process_ticket_booking, "V1", "Dee", "1")
+        self.assertEqual(list(self.system.waitlist["A"]), [("Cid", "1"), ("Dee", "1")])
+        self.assertEqual(FleetOptimizer(self.system).route_demand()["A"], 4)
+        quietly(self.system.reassign_vehicles, {"V2": "A"})
+        booked_names = [traveler.full_name for traveler in self.system.customer_records]
+        self.assertEqual(booked_names, ["Ann", "Bob", "Cid", "Dee"])
+        self.assertEqual(self.system.fleet_of_vehicles["V2"].occupied_seats, 2)
+
+    def test_moving_a_vehicle_books_the_waitlist(self):
+        for passenger in ("Ann", "Bob", "Cid", "Dee"):
+            quietly(self.system.process_ticket_booking, "V1", passenger, "1")
+        self.assertTrue(quietly(self.system.reassign_vehicles, {"V3": "A"}))
+        self.assertEqual(self.system.waitlist["A"], {})
+        self.assertEqual(self.system.fleet_of_vehicles["V3"].occupied_seats, 2)
+        self.assertEqual(len(self.system.customer_records), 4)
+        # Served passengers are no longer counted as extra demand
+        self.assertEqual(FleetOptimizer(self.system).route_demand()["A"], 4)
+
+    def test_booking_removes_passenger_from_waitlist(self):
+        for passenger in ("Ann", "Bob", "Cid"):
+            quietly(self.system.process_ticket_booking, "V1", passenger, "1")
+        quietly(self.system.add_new_vehicle, "V4", "A", 1)
+        quietly(self.system.process_ticket_booking, "V4", "Cid", "1")
+        self.assertEqual(self.system.waitlist["A"], {})
+
+    def test_rebalance_moves_surplus_vehicle_to_route_in_need(self):
+        for passenger in ("Ann", "Bob", "Cid", "Dee", "Eve"):
+            quietly(self.system.process_ticket_booking, "V1", passenger, "1")
+        optimizer = FleetOptimizer(self.system, "revenue")
+        self.assertEqual(optimizer.plan_reassignment(), {"V3": "A"})
+        seats_before, _ = optimizer.evaluate()
+        seats_after, revenue_after = optimizer.evaluate({"V3": "A"})
+        self.assertEqual((seats_before, seats_after, revenue_after), (2, 5, 500.0))
+        self.assertEqual(quietly(optimizer.rebalance), {"V3": "A"})
+        self.assertEqual(self.system.fleet_of_vehicles["V3"].occupied_seats, 3)
+
+    def test_unknown_objective_is_rejected(self):
+        with self.assertRaises(ValueError):
+            FleetOptimizer(self.system, "profit")
+
+
+class BookingAnalyticsTests(unittest.TestCase):
+    def setUp(self):
+        self.now = 7200.0 # Bookings are stamped with this time
+        self.system = CentralBookingSystem(clock=lambda: self.now)
+        quietly(self.system.add_route, "A", "a", "b", 10.0)
+        quietly(self.system.add_route, "B", "b", "c", 4.0)
+        quietly(self.system.add_new_vehicle, "V1", "A", 4)
+        quietly(self.system.add_new_vehicle, "V2", "B", 4)
+
+    def book_sample(self):
+        quietly(self.system.process_ticket_booking, "V1", "Ann", "1")
+        quietly(self.system.process_ticket_booking, "V1", "Bob", "2")
+        self.now = 9000.0
+        quietly(self.system.process_ticket_booking, "V2", "Cid", "3")
+
+    def test_reports_after_bookings(self):
+        self.book_sample()
+        analytics = self.system.analytics
+        self.assertEqual(sorted(analytics.route_report()), [("A", 2, 20.0, 0.5), ("B", 1, 4.0, 0.25)])
+        self.assertEqual(sorted(analytics.vehicle_report()), [("V1", 2, 20.0, 0.5), ("V2", 1, 4.0, 0.25)])
+        self.assertEqual(analytics.time_report(), [(7200, 3, 24.0, 3 / 8)])
+        self.assertEqual((analytics.total_bookings, analytics.total_revenue), (3, 24.0))
+
+    def test_backfill_adds_historical_bookings(self):
+        self.book_sample()
+        analytics = self.system.analytics
+        analytics.backfill(["A", "B", "B"], ["V1", "V2", "V2"], [10.0, 4.0, 4.0], [10.0, 20.0, 3700.0])
+        # Backfilled bookings add to bookings and revenue but not to load factors
+        self.assertEqual(sorted(analytics.route_report()), [("A", 3, 30.0, 0.5), ("B", 3, 12.0, 0.25)])
+        self.assertEqual(sorted(analytics.vehicle_report()), [("V1", 3, 30.0, 0.5), ("V2", 3, 12.0, 0.25)])
+        # Backfilled buckets have no known fleet size, so no load factor
+        self.assertEqual(analytics.time_report(), [(0, 2, 14.0, None), (3600, 1, 4.0, None),
+                                                   (7200, 3, 24.0, 3 / 8)])
+        self.assertEqual((analytics.total_bookings, analytics.total_revenue), (6, 42.0))
+
+    def test_backfill_never_overfills_seats(self):
+        analytics = self.system.analytics
+        quietly(self.system.process_ticket_booking, "V1", "Ann", "1")
+        analytics.backfill(["A"] * 10, ["V1"] * 10, [10.0] * 10, [100.0] * 10)
+        self.now = 11000.0
+        quietly(self.system.process_ticket_booking, "V2", "Bob", "2")
+        self.assertIn(("V1", 11, 110.0, 0.25), analytics.vehicle_report())
+        self.assertIn(("A", 11, 110.0, 0.25), analytics.route_report())
+        self.assertEqual([load_factor for _, _, _, load_factor in analytics.time_report()], [None, 1 / 8, 2 / 8])
+
+    def test_backfill_rejects_uneven_columns(self):
+        with self.assertRaises(ValueError):
+            BookingAnalytics().backfill(["A"], ["V1", "V2"], [1.0], [0.0])
+
+    def test_backfill_from_records_does_not_double_count(self):
+        self.book_sample()
+        analytics = self.system.analytics
+        live_routes = sorted(analytics.route_report())
+        analytics.backfill_from_records(self.system.customer_records)
+        self.assertEqual(sorted(analytics.route_report()), live_routes)
+        self.assertEqual((analytics.total_bookings, analytics.total_revenue), (3, 24.0))
+
+    def test_reassignment_moves_route_capacity(self):
+        quietly(self.system.reassign_vehicles, {"V2": "A"})
+        quietly(self.system.process_ticket_booking, "V1", "Ann", "1")
+        self.assertEqual(sorted(self.system.analytics.route_report()), [("A", 1, 10.0, 1 / 8), ("B", 0, 0.0, 0.0)])
+
+
+class TripScheduleTests(unittest.TestCase):
+    def setUp(self):
+        self.archive_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.archive_directory.cleanup)
+        self.now = datetime(2030, 1, 1, 7, 0).timestamp() # An hour before the first departure
+        self.system = CentralBookingSystem(clock=lambda: self.now)
+        self.system.trip_schedule = TripSchedule(os.path.join(self.archive_directory.name, "trips.jsonl"))
+        quietly(self.system.add_route, "A", "a", "b", 10.0)
+        quietly(self.system.add_route, "B", "b", "a", 10.0)
+        quietly(self.system.add_new_vehicle, "V1", "A", 1)
+        quietly(self.system.add_new_vehicle, "V2", "A", 2)
+        self.start = datetime(2030, 1, 1, 8, 0)
+        # Scheduled out of order on purpose
+        for vehicle_id, hours in (("V1", 5), ("V2", 1), ("V1", 3), ("V2", 0)):
+            quietly(self.system.schedule_trip, vehicle_id, self.start + timedelta(hours=hours))
+        quietly(self.system.schedule_trip, "V1", self.start + timedelta(hours=2), "B")
+
+    def departure_ids(self, after_time, limit=5):
+        return [trip.trip_id for trip in self.system.trip_schedule.next_departures("a", "b", after_time, limit)]
+
+    def test_next_departures_are_ordered_and_after_the_given_time(self):
+        self.assertEqual(self.departure_ids(self.start),
+                         ["V2@20300101090000", "V1@20300101110000", "V1@20300101130000"])
+        self.assertEqual(self.departure_ids(self.start - timedelta(minutes=1), limit=2),
+                         ["V2@20300101080000", "V2@20300101090000"])
+
+    def test_next_departures_skip_full_trips(self):
+        quietly(self.system.process_trip_booking, "V1@20300101110000", "Ann", "1")
+        self.assertEqual(self.departure_ids(self.start),
+                         ["V2@20300101090000", "V1@20300101130000"])
+
+    def test_each_trip_has_its_own_seats(self):
+        quietly(self.system.process_trip_booking, "V1@20300101110000", "Ann", "1")
+        quietly(self.system.process_trip_booking, "V1@20300101110000", "Bob", "2")
+        quietly(self.system.process_trip_booking, "V1@20300101130000", "Bob", "2")
+        self.assertEqual(len(self.system.customer_records), 2)
+        self.assertEqual(self.system.fleet_of_vehicles["V1"].occupied_seats, 0)
+        # V1 runs three one-seat trips; its undated seat is reported separately
+        self.assertIn(("V1", 2, 20.0, 2 / 3), self.system.analytics.vehicle_report(trips=True))
+        self.assertIn(("V1", 0, 0.0, 0.0), self.system.analytics.vehicle_report())
+
+    def test_departed_trips_cannot_be_booked(self):
+        self.now = (self.start + timedelta(hours=1)).timestamp()
+        quietly(self.system.process_trip_booking, "V2@20300101090000", "Ann", "1")
+        quietly(self.system.process_trip_booking, "V2@20300101080000", "Bob", "2")
+        self.assertEqual(self.system.customer_records, [])
+        quietly(self.system.process_trip_booking, "V1@20300101100000", "Cid", "3")
+        self.assertEqual([traveler.full_name for traveler in self.system.customer_records], ["Cid"])
+
+    def test_departures_in_the_same_minute_do_not_collide(self):
+        departure = self.start + timedelta(days=1)
+        self.assertTrue(quietly(self.system.schedule_trip, "V1", departure))
+        self.assertTrue(quietly(self.system.schedule_trip, "V1", departure + timedelta(seconds=30)))
+        self.assertFalse(quietly(self.system.schedule_trip, "V1", departure + timedelta(microseconds=5)))
+
+    def test_timezone_aware_times_are_accepted(self):
+        aware_departure = (self.start + timedelta(days=2)).astimezone(timezone.utc)
+        self.assertTrue(quietly(self.system.schedule_trip, "V2", aware_departure))
+        aware_after = (self.start + timedelta(days=1)).astimezone(timezone.utc)
+        self.assertEqual(self.departure_ids(aware_after), ["V2@20300103080000"])
+
+    def test_archive_departed_moves_trips_to_the_archive(self):
+        quietly(self.system.process_trip_booking, "V2@20300101090000", "Ann", "1")
+        archived_count = quietly(self.system.archive_departed_trips, self.start + timedelta(hours=2, minutes=30))
+        self.assertEqual(archived_count, 3)
+        self.assertEqual(len(self.system.trip_schedule), 2)
+        self.assertEqual(self.departure_ids(self.start - timedelta(days=1)),
+                         ["V1@20300101110000", "V1@20300101130000"])
+        archived = {record['trip_id']: record for record in self.system.trip_schedule.load_archive()}
+        self.assertEqual(sorted(archived), ["V1@20300101100000", "V2@20300101080000", "V2@20300101090000"])
+        self.assertEqual(archived["V2@20300101090000"]['occupied_seats'], 1)
+
+    def test_archive_cut_off_defaults_to_the_system_clock(self):
+        self.assertEqual(quietly(self.system.archive_departed_trips), 0)
+        self.now = (self.start + timedelta(hours=2, minutes=30)).timestamp()
+        self.assertEqual(quietly(self.system.archive_departed_trips), 3)
+        self.assertEqual(len(self.system.trip_schedule), 2)
+
+    def test_failed_archive_write_keeps_the_schedule(self):
+        schedule = self.system.trip_schedule
+        schedule.archive_path = os.path.join(self.archive_directory.name, "missing", "trips.jsonl")
+        with self.assertRaises(OSError):
+            schedule.archive_departed(self.start + timedelta(hours=2, minutes=30))
+        self.assertEqual(len(schedule), 5)
+        self.assertEqual(len(self.departure_ids(self.start - timedelta(days=1))), 4)
+        self.assertEqual(quietly(self.system.archive_departed_trips, self.start + timedelta(hours=2, minutes=30)), 0)
+        self.assertEqual(len(schedule), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
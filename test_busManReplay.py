@@ -0,0 +1,207 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest import mock
+
+import busManNoOOP
+from busManReplay import (ObjectOrientedDriver, ProceduralDriver, RecordingBookingSystem, VirtualClock,
+                          load_trace, percentile, replay_trace)
+from test_busManOOP import quietly
+
+
+class PercentileTests(unittest.TestCase):
+    def test_empty_list_gives_zero(self):
+        self.assertEqual(percentile([], 0.5), 0.0)
+
+    def test_single_value_is_every_percentile(self):
+        for fraction in (0.0, 0.5, 0.99, 1.0):
+            self.assertEqual(percentile([7.0], fraction), 7.0)
+
+    def test_nearest_rank(self):
+        values = list(range(1, 11))
+        self.assertEqual(percentile(values, 0.50), 5)
+        self.assertEqual(percentile(values, 0.95), 10)
+        self.assertEqual(percentile(values, 0.0), 1)
+        self.assertEqual(percentile(values, 1.0), 10)
+        self.assertEqual(percentile(list(range(1, 101)), 0.99), 99)
+
+
+class LoadTraceTests(unittest.TestCase):
+    def setUp(self):
+        trace_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(trace_directory.cleanup)
+        self.trace_path = os.path.join(trace_directory.name, "trace.jsonl")
+
+    def write_trace(self, records):
+        with open(self.trace_path, "w", encoding="utf-8") as trace_file:
+            for record in records:
+                trace_file.write(json.dumps(record) + "\n")
+            trace_file.write("\n")
+
+    def test_operations_are_sorted_by_time(self):
+        self.write_trace([
+            {'at': 2.0, 'op': "list_routes", 'args': {}, 'ok': True},
+            {'at': 0.5, 'op': "list_vehicles", 'args': {}, 'ok': True},
+            {'op': "final_seats", 'started_at': 100.0, 'seats': {}, 'trip_seats': {}},
+        ])
+        operations, final_snapshot = load_trace(self.trace_path)
+        self.assertEqual([record['op'] for record in operations], ["list_vehicles", "list_routes"])
+        self.assertEqual(final_snapshot['started_at'], 100.0)
+
+    def test_trace_without_final_record(self):
+        self.write_trace([{'at': 0.0, 'op': "list_routes", 'args': {}, 'ok': True}])
+        operations, final_snapshot = load_trace(self.trace_path)
+        self.assertEqual(len(operations), 1)
+        self.assertIsNone(final_snapshot)
+
+    def test_unknown_operation_is_rejected(self):
+        self.write_trace([{'at': 0.0, 'op': "list_routes"}, {'at': 1.0, 'op': "cancel"}])
+        with self.assertRaises(ValueError):
+            load_trace(self.trace_path)
+
+
+class RecordAndReplayTests(unittest.TestCase):
+    def setUp(self):
+        trace_directory = tempfile.TemporaryDirectory()
+        self.addCleanup(trace_directory.cleanup)
+        self.trace_path = os.path.join(trace_directory.name, "trace.jsonl")
+        self.recorder = RecordingBookingSystem()
+        self.recorder.trip_schedule.archive_path = os.path.join(trace_directory.name, "archive.jsonl")
+        departure = datetime(2030, 1, 1, 8, 0)
+
+        quietly(self.recorder.add_route, "A", "a", "b", 10.0)
+        quietly(self.recorder.add_route, "B", "b", "c", 5.0)
+        quietly(self.recorder.add_route, "A", "x", "y", 1.0) # Rejected: duplicate name
+        quietly(self.recorder.add_new_vehicle, "V1", "A", 1)
+        quietly(self.recorder.add_new_vehicle, "V2", "B", 2)
+        quietly(self.recorder.process_ticket_booking, "V1", "Ann", "1")
+        quietly(self.recorder.process_ticket_booking, "V1", "Bob", "2") # Rejected: vehicle full
+        quietly(self.recorder.reassign_vehicles, {"V2": "A"}) # Seats Bob from the waitlist
+        quietly(self.recorder.schedule_trip, "V1", departure)
+        quietly(self.recorder.schedule_trip, "V2", departure + timedelta(hours=1))
+        quietly(self.recorder.process_trip_booking, "V1@20300101080000", "Cid", "3")
+        quietly(self.recorder.archive_departed_trips, departure + timedelta(minutes=30))
+        quietly(self.recorder.display_all_routes)
+        quietly(self.recorder.save_trace, self.trace_path)
+
+    def replay(self, final_snapshot_changes=None):
+        operations, final_snapshot = load_trace(self.trace_path)
+        final_snapshot.update(final_snapshot_changes or {})
+        clock = VirtualClock(speedup=0, start_epoch=final_snapshot['started_at'])
+        driver = ObjectOrientedDriver(clock=clock)
+        return driver, replay_trace(operations, driver, clock, final_snapshot)
+
+    def test_trace_records_every_operation(self):
+        operations, final_snapshot = load_trace(self.trace_path)
+        self.assertEqual([record['op'] for record in operations],
+                         ["add_route", "add_route", "add_route", "add_vehicle", "add_vehicle", "book", "book",
+                          "reassign_vehicles", "schedule_trip", "schedule_trip", "book_trip", "archive_trips",
+                          "list_routes"])
+        self.assertEqual([record['ok'] for record in operations][:7], [True, True, False, True, True, True, False])
+        self.assertEqual(final_snapshot['seats'], {"V1": 1, "V2": 1})
+        self.assertEqual(final_snapshot['trip_seats'], {"V2@20300101090000": 0})
+
+    def test_replay_on_the_oop_system_is_clean(self):
+        driver, report = self.replay()
+        self.assertTrue(report.is_correct())
+        self.assertEqual(report.outcome_mismatches, [])
+        self.assertEqual(report.seat_mismatches, {})
+        self.assertEqual(report.trip_seat_mismatches, {})
+        self.assertEqual(sum(len(values) for values in report.latencies.values()), 13)
+        self.assertEqual(driver.system_manager.fleet_of_vehicles["V2"].assigned_route.name, "A")
+        self.assertEqual([traveler.full_name for traveler in driver.system_manager.customer_records],
+                         ["Ann", "Bob", "Cid"])
+        self.assertEqual(driver.system_manager.waitlist["A"], {})
+
+    def test_replay_reports_seat_mismatches(self):
+        _, report = self.replay({'seats': {"V1": 1, "V2": 0}})
+        self.assertFalse(report.is_correct())
+        self.assertEqual(report.seat_mismatches, {"V2": (0, 1)})
+
+
+class ProceduralDriverTests(unittest.TestCase):
+    def setUp(self):
+        # The driver clears the module's sample data; put it back afterwards
+        saved_state = (copy.deepcopy(busManNoOOP.all_routes), copy.deepcopy(busManNoOOP.all_vehicles),
+                       copy.deepcopy(busManNoOOP.all_passengers))
+        self.addCleanup(self.restore_module_state, *saved_state)
+        self.driver = ProceduralDriver(busManNoOOP)
+
+    @staticmethod
+    def restore_module_state(routes, vehicles, passengers):
+        # Update in place: the module functions look these globals up by name
+        busManNoOOP.all_routes.clear()
+        busManNoOOP.all_routes.update(routes)
+        busManNoOOP.all_vehicles.clear()
+        busManNoOOP.all_vehicles.update(vehicles)
+        busManNoOOP.all_passengers[:] = passengers
+
+    def test_prompts_are_answered_from_the_trace(self):
+        self.assertTrue(quietly(self.driver.add_route, "A", "a", "b", 10.0))
+        self.assertTrue(quietly(self.driver.add_vehicle, "V1", "A", 1))
+        self.assertTrue(quietly(self.driver.book, "V1", "Ann", "1"))
+        self.assertFalse(quietly(self.driver.book, "V1", "Bob", "2"))
+        self.assertEqual(busManNoOOP.all_routes, {"A": {'origin': "a", 'destination': "b", 'fare': 10.0}})
+        self.assertEqual(self.driver.occupied_seats(), {"V1": 1})
+        self.assertFalse(hasattr(busManNoOOP, "input"))
+
+    def test_re_prompting_rejects_the_operation(self):
+        # A negative fare makes the module ask again, and the trace has no further answers
+        self.assertFalse(quietly(self.driver.add_route, "A", "a", "b", -5.0))
+        self.assertEqual(busManNoOOP.all_routes, {})
+        self.assertFalse(hasattr(busManNoOOP, "input"))
+
+    def test_unsupported_operations_are_counted(self):
+        operations = [
+            {'at': 0.0, 'op': "add_route", 'args': {'name': "A", 'origin': "a", 'destination': "b",
+                                                    'base_fare': 10.0}, 'ok': True},
+            {'at': 1.0, 'op': "reassign_vehicles", 'args': {'reassignment_plan': {}}, 'ok': False},
+            {'at': 2.0, 'op': "book_trip", 'args': {'trip_id': "V1@20300101080000", 'customer_name': "Ann",
+                                                    'customer_phone': "1"}, 'ok': True},
+            {'at': 3.0, 'op': "book_trip", 'args': {'trip_id': "V1@20300101080000", 'customer_name': "Bob",
+                                                    'customer_phone': "2"}, 'ok': True},
+        ]
+        report = replay_trace(operations, self.driver)
+        self.assertEqual(report.unsupported_operations, {"reassign_vehicles": 1, "book_trip": 2})
+        self.assertEqual(report.outcome_mismatches, [])
+        self.assertFalse(report.is_correct())
+
+
+class VirtualClockTests(unittest.TestCase):
+    def test_negative_speedup_is_rejected(self):
+        with self.assertRaises(ValueError):
+            VirtualClock(speedup=-1)
+
+    def test_clock_never_moves_backwards(self):
+        clock = VirtualClock(speedup=0, start_epoch=1000.0)
+        clock.advance_to(5.0)
+        clock.advance_to(2.0)
+        self.assertEqual(clock.now(), 5.0)
+        self.assertEqual(clock.epoch_time(), 1005.0)
+
+    def test_zero_speedup_never_waits(self):
+        clock = VirtualClock(speedup=0)
+        with mock.patch("busManReplay.time.sleep") as sleep:
+            clock.advance_to(3600.0)
+        sleep.assert_not_called()
+        self.assertEqual(clock.now(), 3600.0)
+
+    def test_pacing_follows_the_replay_start(self):
+        clock = VirtualClock(speedup=10)
+        with mock.patch("busManReplay.time.sleep") as sleep:
+            clock.advance_to(0.0)
+            clock.advance_to(10.0)
+            clock.advance_to(20.0)
+            clock.advance_to(15.0) # Already passed: no wait
+        waits = [call.args[0] for call in sleep.call_args_list]
+        self.assertEqual(len(waits), 2)
+        # Sleep is mocked, so each wait is measured from the replay start, not the previous operation
+        self.assertAlmostEqual(waits[0], 1.0, delta=0.05)
+        self.assertAlmostEqual(waits[1], 2.0, delta=0.05)
+
+
+if __name__ == '__main__':
+    unittest.main()